@@ -1,6 +1,215 @@
+from __future__ import annotations
+
 import math
-from smbus2 import SMBus
+import struct
+from ctypes import c_char
 import time
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from smbus2 import SMBus
+
+
+def _compensate_temp(adc_t: int, dig_t1: int, dig_t2: int, dig_t3: int) -> tuple:
+    """
+        Compensation formulae for temperature.
+        See chapter 8.1 of the official datasheet
+    :param adc_t: raw temperature value read from the sensor
+    :param dig_t1:
+    :param dig_t2:
+    :param dig_t3:
+    :return: tuple with temperature in hundredths of °C and t_fine value, needed for pressure compensation
+    """
+    var1 = (((adc_t >> 3) - (dig_t1 << 1)) * dig_t2) >> 11
+    var2 = (((adc_t >> 4) - dig_t1) * (((adc_t >> 4) - dig_t1) >> 12) * dig_t3) >> 14
+    t_fine = var1 + var2
+
+    temp = (t_fine * 5 + 128) >> 8
+
+    return temp, t_fine
+
+
+def _compensate_pressure(adc_p: int, t_fine: int, dig_p1: int, dig_p2: int, dig_p3: int, dig_p4: int, dig_p5: int,
+                         dig_p6: int, dig_p7: int, dig_p8: int, dig_p9: int) -> int:
+    """
+        Compensation formulae for pressure
+        See chapter 8.1 of the official datasheet
+    :param adc_p: raw pressure value read from the sensor
+    :param t_fine: fine temperature value, as returned by @see _compensate_temp()
+    :param dig_p1:
+    :param dig_p2:
+    :param dig_p3:
+    :param dig_p4:
+    :param dig_p5:
+    :param dig_p6:
+    :param dig_p7:
+    :param dig_p8:
+    :param dig_p9:
+    :return: pressure in Pa as unsigned 24.8 fixed point value
+    """
+    var1 = (t_fine - 128000)
+    var2 = var1 * var1 * dig_p6
+    var2 += (var1 * dig_p5) << 17
+    var2 += dig_p4 << 35
+
+    var1 = ((var1 * var1 * dig_p3) >> 8) + ((var1 * dig_p2) << 12)
+    var1 = (((1 << 47) + var1) * dig_p1) >> 33
+
+    if var1 == 0:
+        return 0
+
+    p = 1048576 - adc_p
+    p = (((p << 31) - var2) * 3125) // var1
+
+    var1 = (dig_p9 * (p >> 13) * (p >> 13)) >> 25
+    var2 = (dig_p8 * p) >> 19
+
+    p = ((p + var1 + var2) >> 8) + (dig_p7 << 4)
+
+    return p
+
+
+# numpy module, imported on first use by @see _import_numpy(); False when numpy is not installed
+_numpy = None
+
+
+def _import_numpy():
+    """
+        Import numpy on first use, so that users not collecting batches of measurements don't pay for it
+    :return: numpy module, or None when numpy is not installed
+    """
+    global _numpy
+
+    if _numpy is None:
+        try:
+            import numpy
+        except ImportError:
+            numpy = False
+        _numpy = numpy
+
+    return _numpy or None
+
+
+# Compensation formulae compiled by numba, see @see _jit_compensation()
+_jitted_compensation = None
+
+
+def _jit_compensation() -> tuple:
+    """
+        Compile the compensation formulae to native code with numba. All the intermediate values fit in 64-bit
+        integers (the reference implementation uses int64_t as well). numba is imported and the functions are
+        compiled only on first use, since both are expensive on small boards
+    :return: tuple with the compiled @see _compensate_temp() and @see _compensate_pressure()
+    """
+    global _jitted_compensation
+
+    if _jitted_compensation is None:
+        from numba import njit
+
+        _jitted_compensation = (njit(cache=True)(_compensate_temp), njit(cache=True)(_compensate_pressure))
+
+    return _jitted_compensation
+
+
+# Source of the compensation function specialized for a given chip: calibration coefficients are inlined as literals,
+# and the terms depending only on them are folded in advance
+_BAKED_COMPENSATION_SOURCE = """
+def compensate(adc_t, adc_p):
+    var1 = (((adc_t >> 3) - %(t1_x2)d) * %(t2)d) >> 11
+    var2 = (((adc_t >> 4) - %(t1)d) * (((adc_t >> 4) - %(t1)d) >> 12) * %(t3)d) >> 14
+    t_fine = var1 + var2
+
+    temp = (t_fine * 5 + 128) >> 8
+
+    var1 = (t_fine - 128000)
+    var2 = var1 * var1 * %(p6)d
+    var2 += (var1 * %(p5)d) << 17
+    var2 += %(p4_shifted)d
+
+    var1 = ((var1 * var1 * %(p3)d) >> 8) + ((var1 * %(p2)d) << 12)
+    var1 = ((%(base)d + var1) * %(p1)d) >> 33
+
+    if var1 == 0:
+        return temp / 100, 0.0
+
+    p = 1048576 - adc_p
+    p = (((p << 31) - var2) * 3125) // var1
+
+    var1 = (%(p9)d * (p >> 13) * (p >> 13)) >> 25
+    var2 = (%(p8)d * p) >> 19
+
+    p = ((p + var1 + var2) >> 8) + %(p7_shifted)d
+
+    return temp / 100, p / 25600.0
+"""
+
+
+def _bake_compensation(calibration_data: list, use_numba: bool = False):
+    """
+        Build a compensation function specialized for the calibration data of a chip: by default, coefficients are
+        inlined as literals in generated source. Only when use_numba is set, the formulae compiled by numba are used
+        instead, with the coefficients bound in a closure
+    :param calibration_data: list of the 12 calibration coefficients, from dig_T1 to dig_P9
+    :param use_numba: use the formulae compiled by numba, see @see _jit_compensation()
+    :return: function taking raw temperature and raw pressure values, returning a tuple with temperature in °C and
+        pressure in hPa
+    """
+    dig_t1, dig_t2, dig_t3, dig_p1, dig_p2, dig_p3, dig_p4, dig_p5, dig_p6, dig_p7, dig_p8, dig_p9 = calibration_data
+
+    if not use_numba:
+        source = _BAKED_COMPENSATION_SOURCE % {
+            't1': dig_t1, 't1_x2': dig_t1 << 1, 't2': dig_t2, 't3': dig_t3,
+            'p1': dig_p1, 'p2': dig_p2, 'p3': dig_p3, 'p4_shifted': dig_p4 << 35, 'p5': dig_p5, 'p6': dig_p6,
+            'p7_shifted': dig_p7 << 4, 'p8': dig_p8, 'p9': dig_p9, 'base': 1 << 47,
+        }
+
+        namespace = {}
+        exec(compile(source, '<bmp280 baked compensation>', 'exec'), namespace)
+
+        return namespace['compensate']
+
+    compensate_temp, compensate_pressure = _jit_compensation()
+
+    def compensate(adc_t, adc_p):
+        temp, t_fine = compensate_temp(adc_t, dig_t1, dig_t2, dig_t3)
+        p = compensate_pressure(adc_p, t_fine, dig_p1, dig_p2, dig_p3, dig_p4, dig_p5, dig_p6, dig_p7, dig_p8, dig_p9)
+        return temp / 100, p / 25600.0
+
+    return compensate
+
+
+def _compensate_pressure_np(adc_p, t_fine, dig_p1: int, dig_p2: int, dig_p3: int, dig_p4: int, dig_p5: int,
+                            dig_p6: int, dig_p7: int, dig_p8: int, dig_p9: int):
+    """
+        Vectorized version of @see _compensate_pressure(), working on numpy int64 arrays of raw values.
+        Temperature needs no vectorized version, since @see _compensate_temp() works on numpy arrays as it is
+    :param adc_p: array of raw pressure values read from the sensor
+    :param t_fine: array of fine temperature values, as returned by @see _compensate_temp()
+    :return: array of pressures in Pa as unsigned 24.8 fixed point values
+    """
+    np = _import_numpy()
+
+    var1 = (t_fine - 128000)
+    var2 = var1 * var1 * dig_p6
+    var2 += (var1 * dig_p5) << 17
+    var2 += dig_p4 << 35
+
+    var1 = ((var1 * var1 * dig_p3) >> 8) + ((var1 * dig_p2) << 12)
+    var1 = (((1 << 47) + var1) * dig_p1) >> 33
+
+    # Samples where var1 is zero would be a division by zero: they are reported as 0, as the scalar version does
+    invalid = var1 == 0
+
+    p = 1048576 - adc_p
+    p = (((p << 31) - var2) * 3125) // np.where(invalid, 1, var1)
+
+    var1 = (dig_p9 * (p >> 13) * (p >> 13)) >> 25
+    var2 = (dig_p8 * p) >> 19
+
+    p = ((p + var1 + var2) >> 8) + (dig_p7 << 4)
+
+    return np.where(invalid, 0, p)
+
 
 class Bmp280(object):
     """
@@ -34,10 +243,12 @@ class Bmp280(object):
     BIT_UPDATING = (1 << 0)
     BIT_MEASURING = (1 << 3)
 
-    def __init__(self, bus: SMBus, address: int = DEFAULT_ADDRESS):
+    def __init__(self, bus: SMBus, address: int = DEFAULT_ADDRESS, use_numba: bool = False):
         """
         :param bus: SMBus instance of the bus where the sensor is allocated
         :param address:  integer which is the sensor address on the bus
+        :param use_numba: compile the compensation formulae with numba (must be installed). Disabled by default,
+            since importing numba and compiling the formulae slows down start-up a lot
         """
         # i2c/spi bus instance
         self.bus = bus
@@ -45,9 +256,18 @@ class Bmp280(object):
         # address of the chip on the bus
         self.address = address
 
+        # whether compensation formulae are compiled with numba
+        self.use_numba = use_numba
+
+        # Preallocated i2c messages for combined write-read transactions, see @see _write_then_read()
+        self.__rdwr_msgs = {}
+
         # calibration data, used to do the proper computation to get temp and pressure
         self.calibration_data = [0] * 12
 
+        # Compensation function specialized for the calibration data, see @see _bake_compensation()
+        self._compensate = None
+
         # Set the default power mode, which is mode_sleep right after power-on-reset
         self.power_mode = self.MODE_FORCED
 
@@ -56,6 +276,16 @@ class Bmp280(object):
         self.__oversampling_temp = 1
         self.__oversampling_press = 1
 
+        # Maximum time (in seconds) the chip takes to complete a measurement with the current oversampling settings
+        self.__t_measure = 0.0
+        self._update_measure_time()
+
+        # Values of the ctrl_meas register for each power mode with the current oversampling settings
+        self.__ctrl_sleep = 0
+        self.__ctrl_forced = 0
+        self.__ctrl_normal = 0
+        self._recompute_ctrl_meas()
+
         # IIR filter coefficient, must be a power of two (see chapter 3.3.3 and 3.4) between 2 and 16, including 0
         self.__iir_filter = 0
 
@@ -94,6 +324,8 @@ class Bmp280(object):
         if value < 0 or value > 6:
             raise ValueError("invalid oversampling rate for temperature parameter")
         self.__oversampling_temp = value
+        self._update_measure_time()
+        self._recompute_ctrl_meas()
 
         # If in normal mode, restart normal mode to set the oversampling argument
         if self.power_mode == self.MODE_NORMAL:
@@ -104,6 +336,8 @@ class Bmp280(object):
         if value < 0 or value > 6:
             raise ValueError("invalid oversampling rate for pressure parameter")
         self.__oversampling_press = value
+        self._update_measure_time()
+        self._recompute_ctrl_meas()
 
         # If in normal mode, restart normal mode to set the oversampling argument
         if self.power_mode == self.MODE_NORMAL:
@@ -130,115 +364,123 @@ class Bmp280(object):
 
         self._set_config_reg()
 
+    def _update_measure_time(self):
+        """
+            Compute the maximum measurement time for the current oversampling settings.
+            See chapter 3.8.1 and appendix B of the official datasheet
+        :return:
+        """
+        # Oversampling register values map to 1x, 2x, 4x, 8x and 16x; 0 means the measurement is skipped
+        osrs_t = 1 << (min(self.__oversampling_temp, 5) - 1) if self.__oversampling_temp else 0
+        osrs_p = 1 << (min(self.__oversampling_press, 5) - 1) if self.__oversampling_press else 0
+
+        t_measure = 1.25 + 2.3 * osrs_t
+        if osrs_p:
+            t_measure += 2.3 * osrs_p + 0.575
+
+        self.__t_measure = t_measure / 1000
+
+    def _recompute_ctrl_meas(self):
+        """
+            Precompute the ctrl_meas register values for each power mode, so they don't need to be built
+            on every mode change or measurement
+        :return:
+        """
+        oversampling = (self.__oversampling_temp << 5) | (self.__oversampling_press << 2)
+
+        self.__ctrl_sleep = oversampling | self.MODE_SLEEP
+        self.__ctrl_forced = oversampling | self.MODE_FORCED
+        self.__ctrl_normal = oversampling | self.MODE_NORMAL
+
     def _initialize_chip(self):
         """
             Do a softreset of the chip, take calibration data and initialize it with default settings
         :return:
         """
+        bus = self.bus
+        address = self.address
+        read = bus.read_byte_data
+
         # Do soft reset of the chip
-        self.bus.write_byte(self.address, self.REG_RESET, self.RESET_MAGIC)
+        bus.write_byte_data(address, self.REG_RESET, self.RESET_MAGIC)
 
-        # Wait until bit 0 of status register turns to 0. When this happens, the
-        # chip is ready
-        updating = True
-        while updating:
-            time.sleep(0.001)
-            status = self.bus.read_byte_data(self.address, self.REG_STATUS)
-            updating = (status & self.BIT_UPDATING) > 0
+        # Wait for the start-up time (2 ms, see chapter 1 of the datasheet), then check that bit 0 of status
+        # register turned to 0. When this happens, the chip is ready
+        time.sleep(0.002)
+        status = read(address, self.REG_STATUS)
+        if status & self.BIT_UPDATING:
+            raise ValueError("Chip is still copying calibration data after start-up time")
 
         # Read and check the chip_id with proper product
-        chip_id = self.bus.read_byte_data(self.address, self.REG_CHIP_ID)
+        chip_id = read(address, self.REG_CHIP_ID)
         if chip_id != self.BMP280_CHIP_ID:
             raise ValueError("Chip ID 0x%02x does not match with BMP280 product" % (chip_id,))
 
         # Read the calibration data (26 bytes). Last two bytes are expected to be 0x00, so check them too
-        calibration_data = self.bus.read_i2c_block_data(self.address, self.REG_CALIB_BASE, 26)
+        calibration_data = self._write_then_read(self.REG_CALIB_BASE, 26)
         if calibration_data[24] != 0x00:
             raise ValueError("Invalid calibration data, byte 24 is not 0x00")
         if calibration_data[25] != 0x00:
             raise ValueError("Invalid calibration data, byte 25 is not 0x00")
 
-        # Calibration data is a set of short/unsigned short 16-bit values. We convert all of them to signed shorts
-        # here, and later we reconverted 0th and 3rd words to unsigned short, as per specs
-        for word in range(0, 12):
-            lsb = word * 2
-            msb = lsb + 1
-            sign = 1 if calibration_data[msb] & 0x80 else 0
-            self.calibration_data[word] = (((calibration_data[msb] & 0x7f) << 8) | calibration_data[lsb]) - (sign * 32768)
+        # Calibration data is a set of little-endian 16-bit words: dig_T1 and dig_P1 are unsigned shorts, all the
+        # others are signed shorts, as per specs (see chapter 3.11.2). Decoded by hand, the sign extension of a
+        # signed word can be done without branches: v = (msb << 8) | lsb; v -= (v & 0x8000) << 1
+        self.calibration_data = list(struct.unpack_from('<HhhHhhhhhhhh', bytes(calibration_data), 0))
 
-        for word in [0, 3]:
-            if self.calibration_data[word] < 0:
-                self.calibration_data[word] += 65536
+        # Keep each coefficient in its own attribute, so compensation does not need to slice the list every time
+        (self.dig_t1, self.dig_t2, self.dig_t3,
+         self.dig_p1, self.dig_p2, self.dig_p3, self.dig_p4, self.dig_p5,
+         self.dig_p6, self.dig_p7, self.dig_p8, self.dig_p9) = self.calibration_data
+
+        # Calibration data never changes, so build a compensation function specialized for it
+        self._compensate = _bake_compensation(self.calibration_data, self.use_numba)
 
         # Set config register with appropriate t_sb and iir_filter values
         self._set_config_reg()
 
-    def _set_config_reg(self):
-        config = (self.__tsb << 5) | (self.__iir_filter << 2)
-
-        # If in NORMAL mode, we have to exit then enter again because the chip may not be able to update the
-        # config byte in this mode, as said in the specs
-        if self.power_mode == self.MODE_NORMAL:
-            self.set_mode(self.MODE_FORCED)
-            self.bus.write_byte_data(self.address, self.REG_CONFIG, config)
-            self.set_mode(self.MODE_NORMAL)
-        else:
-            self.bus.write_byte_data(self.address, self.REG_CONFIG, config)
-
-    def _compensate_temp(self, adc_t: int, dig_t1: int, dig_t2: int, dig_t3) -> tuple:
+    def _write_then_read(self, reg: int, nread: int) -> bytearray:
         """
-            Compensation formulae for temperature.
-            See chapter 8.1 of the official datasheet
-        :param adc_t:
-        :param dig_t1:
-        :param dig_t2:
-        :param dig_t3:
+            Write the register address and read back nread bytes from there in a single combined transaction
+            (repeated start, no stop condition in between). Messages are allocated once and reused on later calls,
+            and the read message fills directly a bytearray owned by the instance.
+            Beware that the returned buffer is overwritten by the next call with the same arguments
+        :param reg: address of the first register to read
+        :param nread: number of bytes to read
         :return:
         """
-        var1 = (((adc_t >> 3) - (dig_t1 << 1)) * dig_t2) >> 11
-        var2 = (((adc_t >> 4) - dig_t1) * (((adc_t >> 4) - dig_t1) >> 12) * dig_t3) >> 14
-        t_fine = var1 + var2
-
-        temp = (t_fine * 5 + 128) >> 8
-
-        return temp / 100, t_fine
-
-    def _compensate_pressure(self, adc_p: int, t_fine: int, dig_p1: int, dig_p2: int, dig_p3: int, dig_p4: int, dig_p5: int,
-                             dig_p6: int, dig_p7: int, dig_p8: int, dig_p9: int) -> float:
-        """
-            Compensation formulae for pressure
-            See chapter 8.1 of the official datasheet
-        :param adc_p:
-        :param t_fine:
-        :param dig_p1:
-        :param dig_p2:
-        :param dig_p3:
-        :param dig_p4:
-        :param dig_p5:
-        :param dig_p6:
-        :return:
-        """
-
-        var1 = (t_fine - 128000)
-        var2 = var1 * var1 * dig_p6
-        var2 += (var1 * dig_p5) << 17
-        var2 += dig_p4 << 35
+        entry = self.__rdwr_msgs.get((reg, nread))
+        if entry is None:
+            # smbus2 is imported only here, on the first transaction, so importing this module stays cheap
+            from smbus2 import i2c_msg
 
-        var1 = ((var1 * var1 * dig_p3) >> 8) + ((var1 * dig_p2) << 12)
-        var1 = (((1 << 47) + var1) * dig_p1) >> 33
+            rx = bytearray(nread)
+            read_msg = i2c_msg.read(self.address, nread)
+            read_msg.buf = (c_char * nread).from_buffer(rx)
+            entry = (i2c_msg.write(self.address, [reg]), read_msg, rx)
+            self.__rdwr_msgs[(reg, nread)] = entry
 
-        if var1 == 0:
-            return 0
+        write_msg, read_msg, rx = entry
+        self.bus.i2c_rdwr(write_msg, read_msg)
 
-        p = 1048576 - adc_p
-        p = (((p << 31) - var2) * 3125) // var1
+        return rx
 
-        var1 = (dig_p9 * (p >> 13) * (p >> 13)) >> 25
-        var2 = (dig_p8 * p) >> 19
+    def _config_reg_value(self) -> int:
+        return (self.__tsb << 5) | (self.__iir_filter << 2)
 
-        p = ((p + var1 + var2) >> 8) + (dig_p7 << 4)
+    def _set_config_reg(self):
+        config = self._config_reg_value()
 
-        return p / 25600.0
+        # If in NORMAL mode, we have to exit then enter again because the chip may not be able to update the
+        # config byte in this mode, as said in the specs. Writes are sent as register/value pairs (the chip
+        # does not auto-increment the address on writes, see chapter 5.2.1), so sleep, config and normal mode
+        # are all written in a single transaction
+        if self.power_mode == self.MODE_NORMAL:
+            self.bus.write_i2c_block_data(self.address, self.REG_CTRL_MEAS, [self.__ctrl_sleep,
+                                                                             self.REG_CONFIG, config,
+                                                                             self.REG_CTRL_MEAS, self.__ctrl_normal])
+        else:
+            self.bus.write_byte_data(self.address, self.REG_CONFIG, config)
 
     def set_mode(self, mode):
         """
@@ -252,15 +494,17 @@ class Bmp280(object):
         """
         if mode == self.MODE_FORCED:
             # When MODE_FORCED is wanted, we just exit the NORMAL mode and enter into SLEEP mode
-            # later, when a measurement is requested, we call MODE_FORCED to wake up the sensor and do the measurement
-            meas = (self.__oversampling_temp << 5) | (self.__oversampling_press << 2) | self.MODE_SLEEP
-            self.bus.write_byte_data(self.address, self.REG_CTRL_MEAS, meas)
+            # later, when a measurement is requested, we call MODE_FORCED to wake up the sensor and do the measurement.
+            # Config register is written in the same transaction, right after the chip entered SLEEP mode
+            self.bus.write_i2c_block_data(self.address, self.REG_CTRL_MEAS, [self.__ctrl_sleep,
+                                                                             self.REG_CONFIG,
+                                                                             self._config_reg_value()])
         elif mode == self.MODE_NORMAL:
             # Enter NORMAL mode, where the sensor reads the values in cyclically. Still you need to call
             # do_measure() to read the values from the sensor to the library, and then read the values with
-            # getters
-            meas = (self.__oversampling_temp << 5) | (self.__oversampling_press << 2) | self.MODE_NORMAL
-            self.bus.write_byte_data(self.address, self.REG_CTRL_MEAS, meas)
+            # getters. Config register is written in the same transaction, just before entering NORMAL mode
+            self.bus.write_i2c_block_data(self.address, self.REG_CONFIG, [self._config_reg_value(),
+                                                                          self.REG_CTRL_MEAS, self.__ctrl_normal])
         else:
             raise ValueError("invalid power mode selected")
 
@@ -272,36 +516,95 @@ class Bmp280(object):
             Data can be later retrieved with @see get_temperature() and @see get_pressure()
         :return:
         """
+        bus = self.bus
+        address = self.address
+        sleep = time.sleep
+
         # If the chip is in sleep mode, do measure trigger the "forced" mode (one-shot sampling)
         if self.power_mode == self.MODE_FORCED:
-            meas = (self.__oversampling_temp << 5) | (self.__oversampling_press << 2) | self.MODE_FORCED
-            self.bus.write_byte_data(self.address, self.REG_CTRL_MEAS, meas)
+            bus.write_byte_data(address, self.REG_CTRL_MEAS, self.__ctrl_forced)
 
-            while True:
-                meas = self.bus.read_byte_data(self.address, self.REG_CTRL_MEAS)
-                if (meas & 0x3) == 0:
-                    break
-                time.sleep(0.001)
+            # Sleep for the whole measurement time at once, instead of polling the chip meanwhile
+            sleep(self.__t_measure)
 
         # We have to wait for bit 3 on status register to turn 0; once then, result of measurement has
-        # been transferred to data registers
+        # been transferred to data registers. Status and data registers are read in a single burst (from 0xf3
+        # up to 0xfc), so when the measurement is already complete no further transaction is needed
+        write_then_read = self._write_then_read
+        reg_status = self.REG_STATUS
+        bit_measuring = self.BIT_MEASURING
         while True:
-            status = self.bus.read_byte_data(self.address, self.REG_STATUS)
-            if status & self.BIT_MEASURING == 0:
+            data = write_then_read(reg_status, 10)
+            if data[0] & bit_measuring == 0:
                 break
-            time.sleep(0.001)
-
-        # Read the data registers of both raw pressure and raw temperature in a single burst, as suggested by specs
-        data = self.bus.read_i2c_block_data(self.address, self.REG_PRESS_MSB, 6)
+            sleep(0.001)
 
-        # Calculate the raw pressure and raw temperature values
-        raw_pressure = (data[0] << 12) | (data[1] << 4) | (data[2] >> 4)
-        raw_temperature = (data[3] << 12) | (data[4] << 4) | (data[5] >> 4)
+        # Calculate the raw pressure and raw temperature values: both are 20-bit big-endian values, left-aligned
+        # on three bytes
+        raw_pressure = int.from_bytes(data[4:7], 'big') >> 4
+        raw_temperature = int.from_bytes(data[7:10], 'big') >> 4
 
-        self.temperature, t_fine = self._compensate_temp(raw_temperature, *self.calibration_data[0:3])
-        self.pressure = self._compensate_pressure(raw_pressure, t_fine, *self.calibration_data[3:])
+        self.temperature, self.pressure = self._compensate(raw_temperature, raw_pressure)
         self.time = time.time()
 
+    def stream(self, n: int, period: float) -> list:
+        """
+            Collect n measurements, one every period seconds, while the chip is in MODE_NORMAL. Since the chip
+            refreshes the data registers on its own, only the data registers are read, without polling the status
+            register. The last measurement is also stored internally, as @see do_measure() does
+        :param n: number of measurements to collect
+        :param period: time between measurements, in seconds; should not be shorter than the chip cycle time
+        :return: list of (temperature, pressure) tuples
+        """
+        if self.power_mode != self.MODE_NORMAL:
+            raise ValueError("stream() is only available in MODE_NORMAL")
+
+        write_then_read = self._write_then_read
+        reg_press_msb = self.REG_PRESS_MSB
+        monotonic = time.monotonic
+        sleep = time.sleep
+
+        # Only raw values are collected in the loop; compensation is done for the whole batch at the end
+        raw_temperatures = []
+        raw_pressures = []
+        next_time = monotonic()
+        for _ in range(n):
+            delay = next_time - monotonic()
+            if delay > 0:
+                sleep(delay)
+            next_time += period
+
+            data = write_then_read(reg_press_msb, 6)
+            raw_pressures.append(int.from_bytes(data[0:3], 'big') >> 4)
+            raw_temperatures.append(int.from_bytes(data[3:6], 'big') >> 4)
+
+        samples = self._compensate_batch(raw_temperatures, raw_pressures)
+        if samples:
+            self.temperature, self.pressure = samples[-1]
+            self.time = time.time()
+
+        return samples
+
+    def _compensate_batch(self, raw_temperatures: list, raw_pressures: list) -> list:
+        """
+            Apply the compensation formulae to a batch of raw values. When numpy is available, the whole batch
+            is computed with vectorized operations, otherwise each sample is compensated on its own
+        :param raw_temperatures: list of raw temperature values read from the sensor
+        :param raw_pressures: list of raw pressure values read from the sensor
+        :return: list of (temperature, pressure) tuples
+        """
+        np = _import_numpy()
+        if np is None:
+            return [self._compensate(raw_t, raw_p) for raw_t, raw_p in zip(raw_temperatures, raw_pressures)]
+
+        temperatures, t_fine = _compensate_temp(np.array(raw_temperatures, dtype=np.int64),
+                                                self.dig_t1, self.dig_t2, self.dig_t3)
+        pressures = _compensate_pressure_np(np.array(raw_pressures, dtype=np.int64), t_fine,
+                                            self.dig_p1, self.dig_p2, self.dig_p3, self.dig_p4, self.dig_p5,
+                                            self.dig_p6, self.dig_p7, self.dig_p8, self.dig_p9)
+
+        return list(zip((temperatures / 100).tolist(), (pressures / 25600.0).tolist()))
+
     def get_temperature(self):
         return self.temperature
 
@@ -1,6 +1,5 @@
 from smbus2 import SMBus
 from bmp280 import Bmp280
-import time
 
 # This script is an example of taking measurements in NORMAL mode (ie: continuous measurements by the chip)
 
@@ -16,9 +15,17 @@ bmp280.set_mode(bmp280.MODE_NORMAL)  # Set the chip in normal mode
 
 try:
     while True:
-        bmp280.do_measure()
-        print("Temperature: %.2f °C - Pressure: %.2f hPa" % (bmp280.get_temperature(), bmp280.get_pressure()))
-        time.sleep(5)
+        # Collect 5 measurements, one per chip cycle, reading only the data registers
+        samples = bmp280.stream(5, 1.0)
+        for temperature, pressure in samples:
+            print("Temperature: %.2f °C - Pressure: %.2f hPa" % (temperature, pressure))
+
+        temperatures = [temperature for temperature, _ in samples]
+        pressures = [pressure for _, pressure in samples]
+        print("Temperature: avg %.2f °C, min %.2f °C, max %.2f °C" %
+              (sum(temperatures) / len(temperatures), min(temperatures), max(temperatures)))
+        print("Pressure: avg %.2f hPa, min %.2f hPa, max %.2f hPa" %
+              (sum(pressures) / len(pressures), min(pressures), max(pressures)))
 except KeyboardInterrupt:
     pass
 